@@ -1,78 +1,256 @@
+import logging
+import os
 import uuid
-import base58
-from typing import Dict, Callable, Optional
-from confluent_kafka import Consumer, KafkaError, KafkaException
+
+try:
+    # Rust/SIMD base58 implementation, ~9x faster on 20/32-byte addresses
+    from based58 import b58encode as _b58encode
+except ImportError:
+    from base58 import b58encode as _b58encode
+
+from typing import Dict, Callable, List, Optional
+import numpy as np
+from confluent_kafka import Consumer, KafkaError
+
+# Select the native protobuf backend so ParseFromString runs in C instead of
+# pure Python. Must be set before any generated module is imported. 'upb' is
+# the native implementation in protobuf >= 4 (the old 'cpp' backend is gone).
+os.environ.setdefault('PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION', 'upb')
+
 from google.protobuf.message import DecodeError
 from google.protobuf.descriptor import FieldDescriptor
 import config
 
 from evm import dex_pool_block_message_pb2
 
+log = logging.getLogger(__name__)
+
 
 def convert_bytes(value, encoding='base58'):
     """Convert bytes to string representation."""
     if encoding == 'base58':
-        return base58.b58encode(value).decode()
+        return _b58encode(value).decode()
+    # bytes.hex() is already a C routine (binascii), so the hex branch
+    # needs no further help
     return '0x' + value.hex()
 
 
+# Per-descriptor field metadata, built once per message type so the
+# reflective walk below iterates plain tuples instead of re-querying
+# FieldDescriptor objects (attribute accesses into the protobuf C wrappers)
+# for every field of every message
+_DESC_CACHE = {}
+
+
+def _fields_meta(descriptor):
+    """Field metadata tuples for a message descriptor, built on first use."""
+    meta = _DESC_CACHE.get(descriptor)
+    if meta is None:
+        meta = [
+            (
+                f.name,
+                f.is_repeated,
+                f.containing_oneof.name if f.containing_oneof else None,
+                f.type == FieldDescriptor.TYPE_MESSAGE,
+                f.type == FieldDescriptor.TYPE_BYTES,
+            )
+            for f in descriptor.fields
+        ]
+        _DESC_CACHE[descriptor] = meta
+    return meta
+
+
 def protobuf_to_dict(msg, encoding='base58'):
     """Convert protobuf message to dictionary."""
     result = {}
-    for field in msg.DESCRIPTOR.fields:
-        value = getattr(msg, field.name)
+    for name, is_repeated, oneof_name, is_message, is_bytes in _fields_meta(msg.DESCRIPTOR):
+        value = getattr(msg, name)
 
-        if field.label == FieldDescriptor.LABEL_REPEATED:
+        if is_repeated:
             if not value:
                 continue
-            result[field.name] = []
-            for item in value:
-                if field.type == FieldDescriptor.TYPE_MESSAGE:
-                    result[field.name].append(protobuf_to_dict(item, encoding))
-                elif field.type == FieldDescriptor.TYPE_BYTES:
-                    result[field.name].append(convert_bytes(item, encoding))
-                else:
-                    result[field.name].append(item)
-
-        elif field.containing_oneof:
-            if msg.WhichOneof(field.containing_oneof.name) == field.name:
-                if field.type == FieldDescriptor.TYPE_MESSAGE:
-                    result[field.name] = protobuf_to_dict(value, encoding)
-                elif field.type == FieldDescriptor.TYPE_BYTES:
-                    result[field.name] = convert_bytes(value, encoding)
+            if is_message:
+                result[name] = [protobuf_to_dict(item, encoding) for item in value]
+            elif is_bytes:
+                result[name] = [convert_bytes(item, encoding) for item in value]
+            else:
+                result[name] = list(value)
+
+        elif oneof_name is not None:
+            if msg.WhichOneof(oneof_name) == name:
+                if is_message:
+                    result[name] = protobuf_to_dict(value, encoding)
+                elif is_bytes:
+                    result[name] = convert_bytes(value, encoding)
                 else:
-                    result[field.name] = value
+                    result[name] = value
 
-        elif field.type == FieldDescriptor.TYPE_MESSAGE:
-            if msg.HasField(field.name):
-                result[field.name] = protobuf_to_dict(value, encoding)
+        elif is_message:
+            if msg.HasField(name):
+                result[name] = protobuf_to_dict(value, encoding)
 
-        elif field.type == FieldDescriptor.TYPE_BYTES:
-            result[field.name] = convert_bytes(value, encoding)
+        elif is_bytes:
+            result[name] = convert_bytes(value, encoding)
 
         else:
-            result[field.name] = value
+            result[name] = value
 
     return result
 
 
+class PriceTiers:
+    """
+    Slippage tiers for one swap direction as parallel numpy arrays.
+
+    The schema encodes tiers as repeated messages (not packed scalars), so
+    they cannot be read with np.frombuffer; instead the scalar fields the
+    price-impact scan consumes are gathered once at decode time into a
+    struct-of-arrays layout (all float64, contiguous).
+    """
+
+    __slots__ = ('slippage_bp', 'max_amount_in', 'price')
+
+    def __init__(self, slippage_bp, max_amount_in, price):
+        self.slippage_bp = slippage_bp
+        self.max_amount_in = max_amount_in
+        self.price = price
+
+
+class PoolEvent:
+    """
+    One decoded pool event, flattened to the fields the strategy consumes.
+
+    Attribute access on __slots__ objects is C-level array indexing,
+    versus a hash-table probe per key for the previous dict-of-dicts
+    layout, and one flat object replaces half a dozen small dicts per
+    event.
+    """
+
+    __slots__ = (
+        'pool_id', 'pool_address',
+        'currency_a_symbol', 'currency_a_decimals',
+        'currency_b_symbol', 'currency_b_decimals',
+        'amount_a', 'amount_b',
+        'mid_ab', 'mid_ba',
+        'tiers_ab', 'tiers_ba',
+        'tx_time_ns', 'tx_time_s',
+    )
+
+    def __init__(self, pool_id, pool_address,
+                 currency_a_symbol, currency_a_decimals,
+                 currency_b_symbol, currency_b_decimals,
+                 amount_a, amount_b,
+                 mid_ab, mid_ba,
+                 tiers_ab, tiers_ba,
+                 tx_time_ns):
+        # Event timestamp in seconds is derived once here rather than per
+        # consumer (flow detection compares whole seconds)
+        self.tx_time_s = tx_time_ns // 1_000_000_000
+        self.pool_id = pool_id
+        self.pool_address = pool_address
+        self.currency_a_symbol = currency_a_symbol
+        self.currency_a_decimals = currency_a_decimals
+        self.currency_b_symbol = currency_b_symbol
+        self.currency_b_decimals = currency_b_decimals
+        self.amount_a = amount_a
+        self.amount_b = amount_b
+        self.mid_ab = mid_ab
+        self.mid_ba = mid_ba
+        self.tiers_ab = tiers_ab
+        self.tiers_ba = tiers_ba
+        self.tx_time_ns = tx_time_ns
+
+
+def _price_tiers_to_arrays(tiers) -> PriceTiers:
+    """Decode repeated PoolPrice messages into a PriceTiers column set."""
+    n = len(tiers)
+    slippage = np.empty(n, dtype=np.float64)
+    max_amount_in = np.empty(n, dtype=np.float64)
+    price = np.empty(n, dtype=np.float64)
+    for i, tier in enumerate(tiers):
+        slippage[i] = tier.SlippageBasisPoints
+        max_amount_in[i] = tier.MaxAmountIn
+        price[i] = tier.Price
+    return PriceTiers(slippage, max_amount_in, price)
+
+
+def decode_dex_pool_block(msg) -> Dict:
+    """
+    Specialized decoder for DexPoolBlockMessage.
+
+    The schema is fixed, so instead of walking msg.DESCRIPTOR.fields
+    reflectively (per-field descriptor lookups, HasField/WhichOneof calls),
+    this touches the known fields the strategy consumes directly and
+    flattens each pool event into a PoolEvent slot object. Numeric fields
+    are converted at the source (int.from_bytes for big-endian bytes fields
+    like Number/BaseFee), so no convert_hex_to_int re-walk of the result is
+    needed. The reflective protobuf_to_dict / convert_hex_to_int pair is
+    kept as a generic fallback for debugging and schema exploration.
+
+    Addresses (PoolId, pool SmartContract) are kept as raw bytes: the
+    strategy only uses them as dict keys, which hash bytes in C without
+    any encoding work. Display sites hex-encode on demand.
+
+    Args:
+        msg: Parsed DexPoolBlockMessage
+
+    Returns:
+        Dictionary with the block header and a list of PoolEvent objects
+    """
+    header = msg.Header
+
+    pool_events = []
+    for event in msg.PoolEvents:
+        pool = event.Pool
+        liquidity = event.Liquidity
+        price_table = event.PoolPriceTable
+
+        pool_events.append(PoolEvent(
+            pool_id=pool.PoolId,
+            pool_address=pool.SmartContract,
+            currency_a_symbol=pool.CurrencyA.Symbol,
+            currency_a_decimals=pool.CurrencyA.Decimals,
+            currency_b_symbol=pool.CurrencyB.Symbol,
+            currency_b_decimals=pool.CurrencyB.Decimals,
+            amount_a=liquidity.AmountCurrencyA,
+            amount_b=liquidity.AmountCurrencyB,
+            mid_ab=price_table.AtoBPrice,
+            mid_ba=price_table.BtoAPrice,
+            tiers_ab=_price_tiers_to_arrays(price_table.AtoBPrices),
+            tiers_ba=_price_tiers_to_arrays(price_table.BtoAPrices),
+            tx_time_ns=event.TransactionHeader.Time,
+        ))
+
+    return {
+        'Header': {
+            'Number': int.from_bytes(header.Number, 'big'),
+            'Time': header.Time,
+            'BaseFee': int.from_bytes(header.BaseFee, 'big'),
+        },
+        'PoolEvents': pool_events,
+    }
+
+
+# Hex-encoded numeric fields, hoisted to module level so the recursive walk
+# below does not rebuild the sets on every call (including every leaf node)
+_NUMERIC_HEX_FIELDS = frozenset({
+    'Number', 'BaseFee', 'ParentNumber', 'PreBalance', 'PostBalance',
+    'MaxAmountIn', 'MaxAmountOut', 'MinAmountOut', 'MinAmountIn',
+    'AmountCurrencyA', 'AmountCurrencyB'
+})
+
+# Fields that should be numeric but might come as strings (decimal or hex)
+_NUMERIC_FIELDS = frozenset({
+    'SlippageBasisPoints', 'Price', 'AtoBPrice', 'BtoAPrice'
+})
+
+
 def convert_hex_to_int(data):
     """Recursively convert hex strings to integers/floats for known numeric fields."""
-    numeric_hex_fields = {
-        'Number', 'BaseFee', 'ParentNumber', 'PreBalance', 'PostBalance',
-        'MaxAmountIn', 'MaxAmountOut', 'MinAmountOut', 'MinAmountIn',
-        'AmountCurrencyA', 'AmountCurrencyB'
-    }
-    
-    # Fields that should be numeric but might come as strings (decimal or hex)
-    numeric_fields = {
-        'SlippageBasisPoints', 'Price', 'AtoBPrice', 'BtoAPrice'
-    }
-    
     if isinstance(data, dict):
         result = {}
         for key, value in data.items():
-            if key in numeric_hex_fields and isinstance(value, str) and value:
+            if key in _NUMERIC_HEX_FIELDS and isinstance(value, str) and value:
                 # Try hex conversion first
                 try:
                     result[key] = int(value, 16)
@@ -85,7 +263,7 @@ def convert_hex_to_int(data):
                             result[key] = int(value)
                     except ValueError:
                         result[key] = value
-            elif key in numeric_fields and isinstance(value, str) and value:
+            elif key in _NUMERIC_FIELDS and isinstance(value, str) and value:
                 # For numeric fields, try decimal first, then hex
                 try:
                     if '.' in value:
@@ -137,6 +315,11 @@ class BitqueryStream:
         
         self.consumer = Consumer(conf)
         self.consumer.subscribe([topic])
+
+        # Reused across parse_message calls: Clear() + ParseFromString is
+        # cheaper than constructing a fresh message per Kafka message, and
+        # parsing happens on a single thread per consumer
+        self._msg = dex_pool_block_message_pb2.DexPoolBlockMessage()
     
     def parse_message(self, buffer: bytes) -> Optional[Dict]:
         """
@@ -149,59 +332,66 @@ class BitqueryStream:
             Parsed dictionary or None if parsing fails
         """
         try:
-            price_feed = dex_pool_block_message_pb2.DexPoolBlockMessage()
+            price_feed = self._msg
+            price_feed.Clear()
             price_feed.ParseFromString(buffer)
-            
-            data_dict = protobuf_to_dict(price_feed, encoding='hex')
-            data_dict = convert_hex_to_int(data_dict)
-            
-            return data_dict
+
+            return decode_dex_pool_block(price_feed)
         except DecodeError as err:
-            print(f"Protobuf decoding error: {err}")
+            log.error("Protobuf decoding error: %s", err)
             return None
         except Exception as err:
-            print(f"Error parsing message: {err}")
+            log.error("Error parsing message: %s", err)
             return None
     
-    def poll(self, timeout: float = 1.0) -> Optional[Dict]:
+    def poll_batch(self, max_messages: int = 500, timeout: float = 1.0) -> List[Dict]:
         """
-        Poll for a new message from Kafka.
-        
+        Poll for a batch of messages from Kafka.
+
+        Fetching up to max_messages per consume() call amortizes the
+        librdkafka boundary crossing over the whole batch instead of
+        paying it once per message.
+
         Args:
-            timeout: Poll timeout in seconds
-            
+            max_messages: Maximum number of messages to fetch per call
+            timeout: Consume timeout in seconds
+
         Returns:
-            Parsed message dictionary or None if no message
+            List of parsed message dictionaries (empty if no messages)
         """
-        msg = self.consumer.poll(timeout=timeout)
-        
-        if msg is None:
-            return None
-        
-        if msg.error():
-            if msg.error().code() == KafkaError._PARTITION_EOF:
-                return None
-            else:
-                raise KafkaException(msg.error())
-        
-        buffer = msg.value()
-        return self.parse_message(buffer)
-    
+        msgs = self.consumer.consume(num_messages=max_messages, timeout=timeout)
+
+        parsed = []
+        for msg in msgs:
+            if msg.error():
+                if msg.error().code() == KafkaError._PARTITION_EOF:
+                    continue
+                # consume() has already advanced past the whole batch (and
+                # auto-commit will commit those offsets), so raising here
+                # would drop every sibling message. Log and keep going.
+                log.error("Kafka error event: %s", msg.error())
+                continue
+
+            data_dict = self.parse_message(msg.value())
+            if data_dict is not None:
+                parsed.append(data_dict)
+
+        return parsed
+
     def stream(self, callback: Callable[[Dict], None], stop_event=None):
         """
         Stream messages and call callback for each message.
-        
+
         Args:
             callback: Function to call with each parsed message
             stop_event: Optional event to signal stopping (not implemented, use KeyboardInterrupt)
         """
         try:
             while True:
-                data_dict = self.poll()
-                if data_dict is not None:
+                for data_dict in self.poll_batch():
                     callback(data_dict)
         except KeyboardInterrupt:
-            print("Stopping stream...")
+            log.info("Stopping stream...")
         finally:
             self.close()
     
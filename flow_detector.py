@@ -8,10 +8,10 @@ from typing import Dict
 import strategy_config as config
 
 # Track recent events per pool to detect isolated shocks vs persistent flow
-pool_event_history: Dict[str, deque] = {}
+pool_event_history: Dict[bytes, deque] = {}
 
 
-def is_isolated_shock(pool_id: str, direction: str, current_time: int) -> bool:
+def is_isolated_shock(pool_id: bytes, direction: str, current_time: int) -> bool:
     """
     Check if this is an isolated shock vs persistent flow.
     
@@ -27,31 +27,25 @@ def is_isolated_shock(pool_id: str, direction: str, current_time: int) -> bool:
     Returns:
         True if isolated (good to fade), False if persistent (avoid)
     """
-    # Initialize history for this pool if needed
-    if pool_id not in pool_event_history:
-        pool_event_history[pool_id] = deque(maxlen=10)
-    
-    history = pool_event_history[pool_id]
-    
-    # Remove events older than our detection window
-    recent_events = [
-        event for event in history
-        if current_time - event['time'] < config.FLOW_DETECTION_WINDOW_SECONDS
-    ]
-    
-    # Count how many events in the same direction happened recently
+    history = pool_event_history.setdefault(pool_id, deque(maxlen=10))
+
+    # Evict events older than our detection window in place. Entries are
+    # appended in time order, so once the head is recent enough we can stop.
+    cutoff = current_time - config.FLOW_DETECTION_WINDOW_SECONDS
+    while history and history[0][1] <= cutoff:
+        history.popleft()
+
+    # Count how many events in the same direction happened recently.
+    # Entries are (direction, time) tuples, so this is a C-level compare
+    # on interned strings rather than a dict lookup per event.
     same_direction_count = sum(
-        1 for event in recent_events
-        if event['direction'] == direction
+        1 for event_direction, _ in history
+        if event_direction == direction
     )
-    
-    # Update history with this new event
-    pool_event_history[pool_id] = deque(recent_events, maxlen=10)
-    pool_event_history[pool_id].append({
-        'direction': direction,
-        'time': current_time
-    })
-    
+
+    # Record this new event
+    history.append((direction, current_time))
+
     # Isolated if very few (or no) events in same direction recently
     return same_direction_count <= config.MAX_SAME_DIRECTION_EVENTS
 
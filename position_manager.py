@@ -2,25 +2,27 @@
 Position Manager
 Monitors active positions and checks stop loss / take profit conditions.
 """
-import time
-from typing import Dict
+import logging
+from bitquery import PoolEvent
 from signal_generator import get_active_positions
 
+log = logging.getLogger(__name__)
 
-def monitor_positions(current_pool_state: Dict):
+
+def monitor_positions(current_pool_state: PoolEvent, now: float):
     """
     Monitor active positions and check if they should be closed.
-    
+
     This function checks:
     1. If entry time has passed (execute the trade)
     2. If stop loss or take profit has been hit (close the position)
-    
+
     Args:
-        current_pool_state: Current pool state dictionary
+        current_pool_state: Decoded pool event with the current pool state
+        now: Current wall-clock time (read once per batch by the caller)
     """
-    pool = current_pool_state.get('Pool', {})
-    pool_id = pool.get('PoolId', '')
-    
+    pool_id = current_pool_state.pool_id
+
     active_positions = get_active_positions()
     
     if pool_id not in active_positions:
@@ -29,19 +31,20 @@ def monitor_positions(current_pool_state: Dict):
     position = active_positions[pool_id]
     
     # Check if entry time has passed
-    if time.time() < position['entry_time']:
+    if now < position['entry_time']:
         return  # Still waiting for entry
     
     # Mark as entered if still pending
     if position['status'] == 'pending':
         position['status'] = 'entered'
-        print(f"[ENTERED] Position for {pool_id}")
+        if log.isEnabledFor(logging.INFO):
+            log.info("[ENTERED] Position for 0x%s", pool_id.hex())
         # In production, execute the trade here
     
     # Check current price vs entry price for stop loss / take profit
     # This is simplified - in production you'd track entry price and compare
-    pool_price_table = current_pool_state.get('PoolPriceTable', {})
-    
+    # (current mid prices are current_pool_state.mid_ab / mid_ba)
+
     # TODO: Implement actual P&L calculation and exit logic
     # For now, just log that we're monitoring
     # In production, you would:
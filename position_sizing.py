@@ -2,13 +2,13 @@
 Position Sizing Calculator
 Calculates appropriate position sizes based on liquidity and price impact.
 """
-from typing import Dict
-from utils import get_currency_decimals, safe_to_numeric
+from bitquery import PoolEvent
+from utils import pow10
 import strategy_config as config
 
 
 def calculate_position_size(
-    pool_event: Dict,
+    pool_event: PoolEvent,
     impact_bp: float,
     fade_direction: str
 ) -> float:
@@ -21,26 +21,22 @@ def calculate_position_size(
     - Never below a minimum threshold
     
     Args:
-        pool_event: Pool event dictionary
+        pool_event: Decoded pool event
         impact_bp: Price impact in basis points
         fade_direction: Direction of fade trade ('AtoB' or 'BtoA')
-        
+
     Returns:
         Position size in smallest unit (raw amount) of the asset being bought
     """
-    liquidity = pool_event.get('Liquidity', {})
-    amount_a = safe_to_numeric(liquidity.get('AmountCurrencyA', 0))
-    amount_b = safe_to_numeric(liquidity.get('AmountCurrencyB', 0))
-    
     # Determine which currency we're buying and its liquidity
     if fade_direction == 'BtoA':
         # Fading by buying A, so position size is in A
-        base_liquidity = amount_a
-        decimals = get_currency_decimals(pool_event, 'A')
+        base_liquidity = pool_event.amount_a
+        decimals = pool_event.currency_a_decimals
     else:  # fade_direction == 'AtoB'
         # Fading by buying B, so position size is in B
-        base_liquidity = amount_b
-        decimals = get_currency_decimals(pool_event, 'B')
+        base_liquidity = pool_event.amount_b
+        decimals = pool_event.currency_b_decimals
     
     if base_liquidity == 0:
         return 0.0
@@ -58,7 +54,7 @@ def calculate_position_size(
     position_size_raw = base_liquidity * config.MAX_POSITION_SIZE_RATIO * impact_factor
     
     # Apply minimum position size
-    min_position_size_raw = config.MIN_POSITION_SIZE * (10 ** decimals)
+    min_position_size_raw = config.MIN_POSITION_SIZE * pow10(decimals)
     
     final_size = max(position_size_raw, min_position_size_raw)
     
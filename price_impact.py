@@ -2,106 +2,138 @@
 Price Impact Calculator
 Calculates the price impact of swaps based on slippage tiers.
 """
-from typing import Dict, Optional, Tuple
-from utils import safe_to_numeric
+from typing import Optional, Tuple
+import numpy as np
+from numba import njit
+from bitquery import PoolEvent, PriceTiers
 import strategy_config as config
 
+# Tiers are ordered by swap size, which in practice means slippage is
+# non-decreasing. That assumption is validated on the first few events per
+# process; if any sample is unsorted, the bisect window is disabled and the
+# kernel falls back to scanning the full arrays.
+_MONOTONIC_SAMPLES_LEFT = 16
+_TIERS_SORTED = True
 
-def calculate_price_impact(pool_event: Dict) -> Optional[Tuple[float, str, float]]:
+
+def _tiers_sorted(slippage_arr) -> bool:
+    """Whether tier slippage can be assumed sorted (sampled at startup)."""
+    global _MONOTONIC_SAMPLES_LEFT, _TIERS_SORTED
+    if _MONOTONIC_SAMPLES_LEFT > 0:
+        _MONOTONIC_SAMPLES_LEFT -= 1
+        if not np.all(slippage_arr[1:] >= slippage_arr[:-1]):
+            _TIERS_SORTED = False
+    return _TIERS_SORTED
+
+
+@njit(cache=True)
+def _impact_kernel(slippage_bp, max_amount_in, price, mid_price,
+                   base_liquidity, min_bp, max_bp, min_ratio):
+    """
+    Scan tiers from the largest swap down and return the first one whose
+    slippage is within [min_bp, max_bp] and whose size is significant
+    relative to liquidity. Pure float64 arithmetic over contiguous arrays,
+    so numba compiles it to a native loop with an early exit; cache=True
+    persists the compiled kernel so production runs skip the JIT warmup.
+
+    Returns:
+        (impact_basis_points, swap_size), or (-1.0, 0.0) if no tier matches
+    """
+    for i in range(slippage_bp.shape[0] - 1, -1, -1):
+        if min_bp <= slippage_bp[i] <= max_bp and \
+                max_amount_in[i] / base_liquidity >= min_ratio:
+            return abs(1.0 - price[i] / mid_price) * 10000.0, max_amount_in[i]
+    return -1.0, 0.0
+
+
+def calculate_price_impact(pool_event: PoolEvent) -> Optional[Tuple[float, str, float]]:
     """
     Calculate price impact from slippage tiers.
-    
+
     This function looks at the pool's price table to find swaps that cause
     significant price movement. It checks both directions (AtoB and BtoA)
     and finds the largest swap that fits within our impact range.
-    
+
     Args:
-        pool_event: Pool event dictionary containing price table and liquidity
-        
+        pool_event: Decoded pool event containing price tiers and liquidity
+
     Returns:
         Tuple of (impact_basis_points, direction, swap_size) or None if no valid impact found
         - impact_basis_points: How much the price moved (in basis points, 100 = 1%)
         - direction: 'AtoB' or 'BtoA' indicating swap direction
         - swap_size: Size of the swap that caused this impact
     """
-    pool_price_table = pool_event.get('PoolPriceTable')
-    if not pool_price_table:
-        return None
-    
-    liquidity = pool_event.get('Liquidity', {})
-    amount_a = safe_to_numeric(liquidity.get('AmountCurrencyA', 0))
-    amount_b = safe_to_numeric(liquidity.get('AmountCurrencyB', 0))
-    
+    amount_a = pool_event.amount_a
+    amount_b = pool_event.amount_b
+
     if amount_a == 0 or amount_b == 0:
         return None
-    
+
     # Check AtoB direction (selling A, buying B)
+    # For AtoB, swap size is checked against A liquidity; for BtoA, against B
     impact = _check_direction(
-        pool_price_table, 'AtoB', amount_a, amount_b
+        pool_event.tiers_ab, pool_event.mid_ab, 'AtoB', amount_a
     )
     if impact:
         return impact
-    
+
     # Check BtoA direction (selling B, buying A)
     impact = _check_direction(
-        pool_price_table, 'BtoA', amount_a, amount_b
+        pool_event.tiers_ba, pool_event.mid_ba, 'BtoA', amount_b
     )
     if impact:
         return impact
-    
+
     return None
 
 
 def _check_direction(
-    pool_price_table: Dict,
+    tiers: PriceTiers,
+    mid_price: float,
     direction: str,
-    amount_a: float,
-    amount_b: float
+    base_liquidity: float
 ) -> Optional[Tuple[float, str, float]]:
     """
     Check price impact for a specific direction (AtoB or BtoA).
-    
+
     Args:
-        pool_price_table: Price table from pool event
+        tiers: Slippage tiers for this direction (parallel numpy arrays)
+        mid_price: Mid price for this direction
         direction: 'AtoB' or 'BtoA'
-        amount_a: Liquidity of currency A
-        amount_b: Liquidity of currency B
-        
+        base_liquidity: Liquidity of the currency being sold
+
     Returns:
         Tuple of (impact_basis_points, direction, swap_size) or None
     """
-    prices_key = f'{direction}Prices'
-    mid_price_key = f'{direction}Price'
-    
-    price_tiers = pool_price_table.get(prices_key, [])
-    if not price_tiers:
+    slippage_arr = tiers.slippage_bp
+    if slippage_arr.size == 0:
+        return None
+
+    if mid_price == 0 or base_liquidity <= 0:
+        return None
+
+    # With sorted slippage, bisect to the window of tiers inside
+    # [MIN, MAX] basis points so the scan skips out-of-range tiers in
+    # O(log n) instead of stepping over them
+    lo = 0
+    hi = slippage_arr.size
+    if _tiers_sorted(slippage_arr):
+        lo = int(np.searchsorted(slippage_arr, config.MIN_IMPACT_BASIS_POINTS, side='left'))
+        hi = int(np.searchsorted(slippage_arr, config.MAX_IMPACT_BASIS_POINTS, side='right'))
+        if lo >= hi:
+            return None
+
+    # Native scan from the largest swap down: impact within our acceptable
+    # range AND swap size significant relative to liquidity
+    impact, max_amount_in = _impact_kernel(
+        slippage_arr[lo:hi], tiers.max_amount_in[lo:hi], tiers.price[lo:hi],
+        float(mid_price), float(base_liquidity),
+        float(config.MIN_IMPACT_BASIS_POINTS),
+        float(config.MAX_IMPACT_BASIS_POINTS),
+        float(config.MIN_LIQUIDITY_RATIO),
+    )
+
+    if impact < 0:
         return None
-    
-    # Start from largest swaps (end of list) and work backwards
-    for tier in reversed(price_tiers):
-        slippage_bp = safe_to_numeric(tier.get('SlippageBasisPoints', 0))
-        max_amount_in = safe_to_numeric(tier.get('MaxAmountIn', 0))
-        price = safe_to_numeric(tier.get('Price', 1.0))
-        
-        # Check if impact is within our acceptable range
-        if not (config.MIN_IMPACT_BASIS_POINTS <= slippage_bp <= config.MAX_IMPACT_BASIS_POINTS):
-            continue
-        
-        # Calculate impact as deviation from mid price
-        mid_price = safe_to_numeric(pool_price_table.get(mid_price_key, 1.0))
-        if mid_price == 0:
-            continue
-        
-        # Impact = how much price deviates from mid price
-        impact = abs(1.0 - (price / mid_price)) * 10000  # Convert to basis points
-        
-        # Check if swap size is significant relative to liquidity
-        # For AtoB, we check against A liquidity; for BtoA, against B liquidity
-        base_liquidity = amount_a if direction == 'AtoB' else amount_b
-        liquidity_ratio = max_amount_in / base_liquidity if base_liquidity > 0 else 0
-        
-        if liquidity_ratio >= config.MIN_LIQUIDITY_RATIO:
-            return (impact, direction, max_amount_in)
-    
-    return None
 
+    return (impact, direction, max_amount_in)
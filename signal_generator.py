@@ -2,19 +2,20 @@
 Signal Generator
 Creates and validates trading signals based on pool events.
 """
-import time
-from typing import Dict, Optional, Tuple
-from utils import get_currency_decimals
-from price_impact import calculate_price_impact
+import logging
+from typing import Dict, Tuple
+from bitquery import PoolEvent
 from flow_detector import is_isolated_shock
 from position_sizing import calculate_position_size
 import strategy_config as config
 
+log = logging.getLogger(__name__)
+
 # Track active positions to avoid duplicate trades
-active_positions: Dict[str, Dict] = {}
+active_positions: Dict[bytes, Dict] = {}
 
 
-def should_fade(pool_event: Dict, impact_data: Tuple[float, str, float]) -> bool:
+def should_fade(pool_event: PoolEvent, impact_data: Tuple[float, str, float]) -> bool:
     """
     Decide if we should fade (bet against) this price move.
     
@@ -23,40 +24,42 @@ def should_fade(pool_event: Dict, impact_data: Tuple[float, str, float]) -> bool
     2. We don't already have a position in this pool
     
     Args:
-        pool_event: Pool event dictionary
+        pool_event: Decoded pool event
         impact_data: Tuple of (impact_bp, direction, swap_size)
-        
+
     Returns:
         True if we should fade, False otherwise
     """
     impact_bp, direction, swap_size = impact_data
-    
-    pool = pool_event.get('Pool', {})
-    pool_id = pool.get('PoolId', '')
-    
+
+    pool_id = pool_event.pool_id
+
     if not pool_id:
         return False
-    
-    # Get event timestamp
-    tx_header = pool_event.get('TransactionHeader', {})
-    event_time = tx_header.get('Time', 0) // 1_000_000_000  # Convert nanoseconds to seconds
-    
-    # Check if this is an isolated shock (not persistent flow)
-    if not is_isolated_shock(pool_id, direction, event_time):
-        print(f"[SKIP] Persistent flow detected for {pool_id}, not fading")
-        return False
-    
-    # Check if we already have a position in this pool
+
+    # Check if we already have a position in this pool first: it is a plain
+    # membership test, and pools we cannot trade anyway should not mutate
+    # (or allocate) flow-detection history
     if pool_id in active_positions:
-        print(f"[SKIP] Active position exists for {pool_id}")
+        # Guarded so the hex encoding is skipped when INFO is off
+        if log.isEnabledFor(logging.INFO):
+            log.info("[SKIP] Active position exists for 0x%s", pool_id.hex())
         return False
-    
+
+    # Check if this is an isolated shock (not persistent flow); the event
+    # timestamp in seconds is precomputed by the decoder
+    if not is_isolated_shock(pool_id, direction, pool_event.tx_time_s):
+        if log.isEnabledFor(logging.INFO):
+            log.info("[SKIP] Persistent flow detected for 0x%s, not fading", pool_id.hex())
+        return False
+
     return True
 
 
 def create_fade_signal(
-    pool_event: Dict,
-    impact_data: Tuple[float, str, float]
+    pool_event: PoolEvent,
+    impact_data: Tuple[float, str, float],
+    now: float
 ) -> Dict:
     """
     Create a fade signal with all entry details.
@@ -65,9 +68,10 @@ def create_fade_signal(
     We take the opposite side of the aggressive swap.
     
     Args:
-        pool_event: Pool event dictionary
+        pool_event: Decoded pool event
         impact_data: Tuple of (impact_bp, direction, swap_size)
-        
+        now: Current wall-clock time (read once per batch by the caller)
+
     Returns:
         Dictionary containing all signal details:
         - pool_id, currencies, directions
@@ -75,41 +79,32 @@ def create_fade_signal(
         - stop loss and take profit levels
     """
     impact_bp, direction, swap_size = impact_data
-    
-    pool = pool_event.get('Pool', {})
-    pool_id = pool.get('PoolId', '')
-    currency_a = pool.get('CurrencyA', {})
-    currency_b = pool.get('CurrencyB', {})
-    
+
     # Determine fade direction (opposite of the swap)
     # If swap is AtoB (selling A), we fade by buying A (BtoA)
     # If swap is BtoA (selling B), we fade by buying B (AtoB)
     fade_direction = 'BtoA' if direction == 'AtoB' else 'AtoB'
-    
+
     # Calculate position size
     position_size = calculate_position_size(pool_event, impact_bp, fade_direction)
-    
-    # Get decimals for proper formatting
-    decimals_a = get_currency_decimals(pool_event, 'A')
-    decimals_b = get_currency_decimals(pool_event, 'B')
-    
+
     # Determine which currency's decimals to use
     if direction == 'AtoB':
-        swap_decimals = decimals_a
+        swap_decimals = pool_event.currency_a_decimals
     else:
-        swap_decimals = decimals_b
-    
+        swap_decimals = pool_event.currency_b_decimals
+
     # Position size decimals depend on what we're buying
     if fade_direction == 'BtoA':
-        position_decimals = decimals_a  # Buying A
+        position_decimals = pool_event.currency_a_decimals  # Buying A
     else:
-        position_decimals = decimals_b  # Buying B
-    
+        position_decimals = pool_event.currency_b_decimals  # Buying B
+
     signal = {
-        'pool_id': pool_id,
-        'pool_address': pool.get('SmartContract', ''),
-        'currency_a': currency_a.get('Symbol', ''),
-        'currency_b': currency_b.get('Symbol', ''),
+        'pool_id': pool_event.pool_id,
+        'pool_address': pool_event.pool_address,
+        'currency_a': pool_event.currency_a_symbol,
+        'currency_b': pool_event.currency_b_symbol,
         'swap_direction': direction,
         'fade_direction': fade_direction,
         'impact_basis_points': impact_bp,
@@ -117,7 +112,7 @@ def create_fade_signal(
         'swap_size_decimals': swap_decimals,
         'position_size': position_size,  # Raw amount
         'position_size_decimals': position_decimals,
-        'entry_time': time.time() + config.WAIT_TIME_SECONDS,  # Wait before entry
+        'entry_time': now + config.WAIT_TIME_SECONDS,  # Wait before entry
         'stop_loss_bp': config.STOP_LOSS_BASIS_POINTS,
         'take_profit_bp': config.TAKE_PROFIT_BASIS_POINTS,
         'status': 'pending'
@@ -126,7 +121,7 @@ def create_fade_signal(
     return signal
 
 
-def get_active_positions() -> Dict[str, Dict]:
+def get_active_positions() -> Dict[bytes, Dict]:
     """
     Get all active positions.
     
@@ -136,7 +131,7 @@ def get_active_positions() -> Dict[str, Dict]:
     return active_positions
 
 
-def add_position(pool_id: str, signal: Dict):
+def add_position(pool_id: bytes, signal: Dict):
     """
     Add a new position to tracking.
     
@@ -147,7 +142,7 @@ def add_position(pool_id: str, signal: Dict):
     active_positions[pool_id] = signal
 
 
-def has_position(pool_id: str) -> bool:
+def has_position(pool_id: bytes) -> bool:
     """
     Check if we have an active position in a pool.
     
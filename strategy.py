@@ -3,73 +3,116 @@ Main Trading Strategy
 Orchestrates the fade strategy: waits for sudden price jumps, bets they won't last,
 trades with strict risk limits, and exits quickly.
 """
+import logging
+import logging.handlers
+import queue
+import threading
+import time
 from typing import Dict
-from bitquery import BitqueryStream
-from utils import format_amount, get_currency_decimals
+from bitquery import BitqueryStream, PoolEvent
+from utils import format_amount
 from price_impact import calculate_price_impact
 from signal_generator import should_fade, create_fade_signal, add_position
 from position_manager import monitor_positions
 import strategy_config as config
 
+log = logging.getLogger(__name__)
 
-def process_pool_event(pool_event: Dict):
+
+def setup_logging(level: int = logging.INFO) -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue to a background writer thread.
+
+    Stream handlers acquire the stdout lock and flush synchronously; at
+    Bitquery stream rates that stalls the event loop. QueueHandler.emit is
+    a single non-blocking put, and the QueueListener thread does the
+    actual formatting and writing.
+
+    Args:
+        level: Root log level (set to WARNING to silence per-event output)
+
+    Returns:
+        The started QueueListener; call .stop() at shutdown to flush
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(message)s'))
+
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    return listener
+
+
+def process_pool_event(pool_event: PoolEvent, now: float):
     """
     Process a single pool event and generate trading signals.
-    
+
     This is the main event processing function that:
     1. Calculates price impact
     2. Decides if we should fade
     3. Creates and stores the signal
-    
+
     Args:
-        pool_event: Pool event dictionary from Bitquery stream
+        pool_event: Decoded pool event from Bitquery stream
+        now: Current wall-clock time (read once per batch)
     """
-    pool = pool_event.get('Pool', {})
-    pool_id = pool.get('PoolId', '')
-    
+    pool_id = pool_event.pool_id
+
     if not pool_id:
         return
-    
+
     # Calculate price impact
     impact_data = calculate_price_impact(pool_event)
-    
+
     if not impact_data:
         return
-    
+
     impact_bp, direction, swap_size = impact_data
-    
-    # Get decimals and symbol for display
-    if direction == 'AtoB':
-        swap_decimals = get_currency_decimals(pool_event, 'A')
-        swap_symbol = pool.get('CurrencyA', {}).get('Symbol', 'A')
-    else:
-        swap_decimals = get_currency_decimals(pool_event, 'B')
-        swap_symbol = pool.get('CurrencyB', {}).get('Symbol', 'B')
-    
-    print(f"\n[EVENT] Pool: {pool_id}")
-    print(f"  Direction: {direction}")
-    print(f"  Impact: {impact_bp:.2f} bps")
-    print(f"  Swap Size: {format_amount(swap_size, swap_decimals)} {swap_symbol}")
+
+    # This block is display-only: the isEnabledFor guard skips the symbol
+    # selection, hex encoding and amount formatting when INFO is off
+    if log.isEnabledFor(logging.INFO):
+        # Get decimals and symbol for display
+        if direction == 'AtoB':
+            swap_decimals = pool_event.currency_a_decimals
+            swap_symbol = pool_event.currency_a_symbol or 'A'
+        else:
+            swap_decimals = pool_event.currency_b_decimals
+            swap_symbol = pool_event.currency_b_symbol or 'B'
+
+        # pool_id is raw bytes; hex-encode only here at the display site
+        log.info(
+            "\n[EVENT] Pool: 0x%s\n  Direction: %s\n  Impact: %.2f bps\n  Swap Size: %s %s",
+            pool_id.hex(), direction, impact_bp,
+            format_amount(swap_size, swap_decimals), swap_symbol,
+        )
     
     # Check if we should fade
     if should_fade(pool_event, impact_data):
-        signal = create_fade_signal(pool_event, impact_data)
-        
-        # Determine position currency symbol for display
-        if signal['fade_direction'] == 'AtoB':
-            position_symbol = signal['currency_b']  # Buying B
-            position_decimals = get_currency_decimals(pool_event, 'B')
-        else:  # fade_direction == 'BtoA'
-            position_symbol = signal['currency_a']  # Buying A
-            position_decimals = get_currency_decimals(pool_event, 'A')
+        signal = create_fade_signal(pool_event, impact_data, now)
         
-        print(f"\n[FADE SIGNAL]")
-        print(f"  Pool: {signal['currency_a']}/{signal['currency_b']}")
-        print(f"  Fade Direction: {signal['fade_direction']}")
-        print(f"  Position Size: {format_amount(signal['position_size'], position_decimals)} {position_symbol}")
-        print(f"  Entry Time: {time.ctime(signal['entry_time'])}")
-        print(f"  Stop Loss: {signal['stop_loss_bp']} bps")
-        print(f"  Take Profit: {signal['take_profit_bp']} bps")
+        if log.isEnabledFor(logging.INFO):
+            # Determine position currency symbol for display
+            if signal['fade_direction'] == 'AtoB':
+                position_symbol = signal['currency_b']  # Buying B
+                position_decimals = pool_event.currency_b_decimals
+            else:  # fade_direction == 'BtoA'
+                position_symbol = signal['currency_a']  # Buying A
+                position_decimals = pool_event.currency_a_decimals
+
+            log.info(
+                "\n[FADE SIGNAL]\n  Pool: %s/%s\n  Fade Direction: %s\n  Position Size: %s %s"
+                "\n  Entry Time: %s\n  Stop Loss: %d bps\n  Take Profit: %d bps",
+                signal['currency_a'], signal['currency_b'], signal['fade_direction'],
+                format_amount(signal['position_size'], position_decimals), position_symbol,
+                time.ctime(signal['entry_time']), signal['stop_loss_bp'], signal['take_profit_bp'],
+            )
         
         # Store as pending position
         add_position(pool_id, signal)
@@ -86,41 +129,92 @@ def handle_message(data_dict: Dict):
     Args:
         data_dict: Parsed message dictionary from Kafka
     """
+    # Read the wall clock once per message instead of per event/signal
+    now = time.time()
+
     # Process pool events
     pool_events = data_dict.get('PoolEvents', [])
     for pool_event in pool_events:
         # Monitor existing positions first
-        monitor_positions(pool_event)
-        
+        monitor_positions(pool_event, now)
+
         # Process new event for potential signals
-        process_pool_event(pool_event)
+        process_pool_event(pool_event, now)
+
+
+def _produce_messages(stream: BitqueryStream, buffer: queue.SimpleQueue,
+                      stop_event: threading.Event):
+    """
+    Fetch and parse Kafka batches on a background thread.
+
+    Consuming and decoding happen here while the main thread runs the
+    strategy logic, so I/O latency is hidden behind compute and vice
+    versa. The consume call spends most of its time blocked in C, so it
+    barely contends for the GIL.
+
+    Any exception is forwarded through the buffer so the main loop
+    re-raises it: a dead feed must crash loudly, not leave the process
+    idling on an empty queue.
+
+    Args:
+        stream: Connected BitqueryStream
+        buffer: Queue of parsed messages drained by the main thread
+        stop_event: Set by the main thread to request shutdown
+    """
+    try:
+        while not stop_event.is_set():
+            for data_dict in stream.poll_batch():
+                buffer.put(data_dict)
+    except Exception as err:
+        buffer.put(err)
 
 
 def main():
     """Main strategy execution."""
-    print("Strategy initialized. Listening for pool events...")
-    print(f"Configuration:")
-    print(f"  Min Impact: {config.MIN_IMPACT_BASIS_POINTS} bps")
-    print(f"  Max Impact: {config.MAX_IMPACT_BASIS_POINTS} bps")
-    print(f"  Wait Time: {config.WAIT_TIME_SECONDS}s")
-    print(f"  Max Position Size: {config.MAX_POSITION_SIZE_RATIO*100}% of liquidity")
-    
+    listener = setup_logging()
+
+    log.info("Strategy initialized. Listening for pool events...")
+    log.info("Configuration:")
+    log.info("  Min Impact: %d bps", config.MIN_IMPACT_BASIS_POINTS)
+    log.info("  Max Impact: %d bps", config.MAX_IMPACT_BASIS_POINTS)
+    log.info("  Wait Time: %ds", config.WAIT_TIME_SECONDS)
+    log.info("  Max Position Size: %s%% of liquidity", config.MAX_POSITION_SIZE_RATIO * 100)
+
     stream = BitqueryStream(topic='eth.dexpools.proto', group_id_suffix='strategy')
-    
+
+    # SimpleQueue is lock-light (put/get are single C calls), so the
+    # producer thread and the strategy loop don't contend on it
+    buffer: queue.SimpleQueue = queue.SimpleQueue()
+    stop_event = threading.Event()
+    producer = threading.Thread(
+        target=_produce_messages,
+        args=(stream, buffer, stop_event),
+        name='bitquery-producer',
+        daemon=True,
+    )
+    producer.start()
+
     try:
         while True:
-            data_dict = stream.poll()
-            if data_dict is not None:
-                handle_message(data_dict)
+            try:
+                data_dict = buffer.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            if isinstance(data_dict, Exception):
+                # Forwarded from the producer thread; fail loudly here
+                raise data_dict
+            handle_message(data_dict)
     except KeyboardInterrupt:
-        print("\nStopping strategy...")
+        log.info("\nStopping strategy...")
         from signal_generator import get_active_positions
         active_positions = get_active_positions()
-        print(f"Active positions: {len(active_positions)}")
+        log.info("Active positions: %d", len(active_positions))
     finally:
+        stop_event.set()
+        producer.join(timeout=5.0)
         stream.close()
+        listener.stop()
 
 
 if __name__ == '__main__':
-    import time
     main()
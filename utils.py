@@ -1,4 +1,23 @@
-from typing import Dict, Union
+from typing import Union
+
+# Powers of ten for decimal scaling, precomputed so the per-event math does
+# no exponentiation (token decimals are small: typically 6, 8 or 18)
+_POW10F = tuple(float(10 ** i) for i in range(40))
+
+
+def pow10(decimals: int) -> float:
+    """
+    Return 10**decimals as a float, from the precomputed table when possible.
+
+    Args:
+        decimals: Number of decimals
+
+    Returns:
+        10**decimals as a float
+    """
+    if 0 <= decimals < 40:
+        return _POW10F[decimals]
+    return 10.0 ** decimals
 
 
 def safe_to_numeric(value: Union[str, int, float]) -> Union[int, float]:
@@ -13,43 +32,31 @@ def safe_to_numeric(value: Union[str, int, float]) -> Union[int, float]:
     """
     if isinstance(value, (int, float)):
         return value
-    if isinstance(value, str):
-        # Try hex conversion first (for hex strings)
-        if value.startswith('0x') or (len(value) > 0 and all(c in '0123456789abcdefABCDEF' for c in value)):
+    if isinstance(value, str) and value:
+        # 0x-prefixed strings are unambiguously hex
+        if value.startswith('0x'):
             try:
                 return int(value, 16)
             except ValueError:
-                pass
-        # Try regular int/float conversion
+                return 0
+        # int()/float() are C-level parsers; trying them directly is much
+        # cheaper than scanning the string character by character to guess
+        # the base. Bare hex (no 0x prefix) is the fallback of last resort.
         try:
-            if '.' in value:
-                return float(value)
             return int(value)
         except ValueError:
             pass
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            return int(value, 16)
+        except ValueError:
+            pass
     return 0
 
 
-def get_currency_decimals(pool_event: Dict, currency: str) -> int:
-    """
-    Get decimals for a currency from pool event.
-    
-    Args:
-        pool_event: Pool event dictionary
-        currency: 'A' or 'B' to specify which currency
-        
-    Returns:
-        Number of decimals (default 18 if not found)
-    """
-    pool = pool_event.get('Pool', {})
-    if currency == 'A':
-        currency_obj = pool.get('CurrencyA', {})
-    else:
-        currency_obj = pool.get('CurrencyB', {})
-    
-    return currency_obj.get('Decimals', 18)
-
-
 def apply_decimals(amount: float, decimals: int) -> float:
     """
     Convert amount from smallest unit to human-readable format.
@@ -63,7 +70,7 @@ def apply_decimals(amount: float, decimals: int) -> float:
     """
     if amount == 0:
         return 0.0
-    return amount / (10 ** decimals)
+    return amount / pow10(decimals)
 
 
 def format_amount(amount: float, decimals: int, precision: int = 2) -> str: